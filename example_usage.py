@@ -43,14 +43,15 @@ def example_multi_page():
             print(f"Successful pages: {result['successful_pages']}")
             print(f"Failed pages: {result['failed_pages']}")
             
-            # Show results for each page
+            # Show results for each page (full extractions are streamed to
+            # combined_results.jsonl; only lightweight records come back)
             print("\nPage Results:")
             for page_num in sorted(result['results'].keys()):
                 page_result = result['results'][page_num]
                 if 'error' in page_result:
                     print(f"  Page {page_num}: ERROR - {page_result['error']}")
                 else:
-                    product_count = len(page_result.get('products', []))
+                    product_count = page_result.get('product_count', 0)
                     print(f"  Page {page_num}: SUCCESS - {product_count} products")
                     
         except Exception as e:
@@ -97,11 +98,7 @@ if __name__ == "__main__":
     print("\nOutput Structure:")
     print("output/")
     print("└── YYYYMMDD-HHMMSS/")
-    print("    ├── 001/")
-    print("    │   ├── result.json")
-    print("    │   └── summary.txt")
-    print("    ├── 002/")
-    print("    │   ├── result.json")
-    print("    │   └── summary.txt")
     print("    ├── processing_summary.txt")
-    print("    └── combined_results.json")
+    print("    └── combined_results.jsonl")
+    print("\nPer-page directories (001/result.json + 001/summary.txt) are")
+    print("written for failed pages, or for all pages with OCR_WRITE_PER_PAGE=1.")
@@ -1,15 +1,66 @@
+import asyncio
+import gzip
+import hashlib
+import io
 import json
+import mmap
+import msgspec
+import orjson
 import os
+import queue
+import re
 import requests
 import tempfile
 import shutil
+import socket
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import Future
 from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
+from cachetools import LFUCache
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.util.retry import Retry
+import httpx
 import PyPDF2
 import logging
 
+# Optional async I/O accelerators: aiofiles moves page-file reads off the
+# event loop, uvloop swaps in a faster (io_uring-era) loop implementation
+try:
+    import aiofiles
+except ImportError:
+    aiofiles = None
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+# Optional incremental JSON parser for very large API responses
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# Optional zstd codec for compressed uploads (OCR_UPLOAD_CODEC=zstd)
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# pikepdf (QPDF-backed, C++) splits pages by sharing indirect objects via
+# reference instead of re-serializing the page tree per page; PyPDF2 is
+# the pure-Python fallback
+try:
+    import pikepdf
+except ImportError:
+    pikepdf = None
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -17,10 +68,214 @@ logger = logging.getLogger(__name__)
 # Load environment variables from .env file
 load_dotenv()
 
-# Get configuration from environment variables
-VA_API_KEY = os.getenv('VISION_AGENT_API_KEY')
-if not VA_API_KEY:
-    raise ValueError("VISION_AGENT_API_KEY not found in environment variables. Please set it in your .env file.")
+def _get_api_key():
+    """
+    Read the Vision Agent API key from the environment.
+
+    Resolved lazily so that importing this module never fails or does
+    network-visible work; only actual API calls require the key.
+
+    Returns:
+        str: The configured API key
+
+    Raises:
+        ValueError: If the API key is not configured
+    """
+    api_key = os.getenv('VISION_AGENT_API_KEY')
+    if not api_key:
+        raise ValueError("VISION_AGENT_API_KEY not found in environment variables. Please set it in your .env file.")
+    return api_key
+
+API_URL = "https://api.va.landing.ai/v1/tools/agentic-document-analysis"
+
+# Authorization header dict, built once on first use (the key lookup is
+# deliberately lazy so imports never require configuration)
+_auth_headers = None
+
+def _get_auth_headers():
+    """Return the shared Authorization header dict, building it on first use."""
+    global _auth_headers
+    if _auth_headers is None:
+        _auth_headers = {"Authorization": f"Basic {_get_api_key()}"}
+    return _auth_headers
+
+# Shared HTTP session so parallel page workers reuse pooled connections
+# instead of paying a TCP+TLS handshake per API call. Retry must opt in
+# to POST (urllib3 skips it by default) and honors Retry-After so 429s
+# back off for exactly as long as the API asks.
+_retry = Retry(
+    total=4,
+    backoff_factor=0.5,
+    status_forcelist=[429, 500, 502, 503, 504],
+    allowed_methods=["POST"],
+    respect_retry_after_header=True,
+)
+
+# Both httpx transports (the async fan-out and the opt-in OCR_HTTP2 sync
+# client) lack status-based retry machinery — this mirrors the urllib3
+# config above for those paths
+_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+_HTTPX_RETRY_TOTAL = 4
+_HTTPX_BACKOFF_FACTOR = 0.5
+
+def _httpx_retry_delay(response, attempt):
+    """
+    Delay before the next httpx retry attempt, in seconds.
+
+    Honors a numeric Retry-After header (what the API asks for on a
+    429) and falls back to the same exponential backoff schedule as the
+    sync Retry config.
+    """
+    retry_after = response.headers.get('Retry-After')
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            pass  # HTTP-date form; use the backoff schedule
+    return _HTTPX_BACKOFF_FACTOR * (2 ** attempt)
+class _TunedAdapter(HTTPAdapter):
+    """
+    HTTPAdapter with socket options tuned for large multipart uploads.
+
+    Disables Nagle (TCP_NODELAY) and enlarges the send buffer to 4MB so
+    MB-scale bodies fill high-bandwidth-delay links instead of trickling
+    out in small delayed segments.
+    """
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs["socket_options"] = HTTPConnection.default_socket_options + [
+            (socket.IPPROTO_TCP, socket.TCP_NODELAY, 1),
+            (socket.SOL_SOCKET, socket.SO_SNDBUF, 4 * 1024 * 1024),
+        ]
+        super().init_poolmanager(*args, **kwargs)
+
+_session = requests.Session()
+_adapter = _TunedAdapter(pool_connections=16, pool_maxsize=32, max_retries=_retry)
+_session.mount("https://", _adapter)
+_session.mount("http://", _adapter)
+
+# (connect, read) timeout for API calls: fail connection attempts fast so
+# a hung socket frees its worker slot, but allow slow document analysis
+_TIMEOUT = (5, 180)
+
+# One-shot TLS warm-up state (see _lazy_warm)
+_warm_started = False
+_warm_lock = threading.Lock()
+
+def _lazy_warm():
+    """
+    Kick off a one-time background TLS warm-up of the API host.
+
+    A throwaway HEAD request completes the TCP+TLS handshake and leaves
+    a warm connection (and TLS session ticket) in the pool, so the first
+    real page upload resumes the session instead of paying a full
+    handshake round-trip. Runs in a daemon thread and is triggered
+    lazily from the processing entry points, keeping plain imports free
+    of network traffic.
+    """
+    global _warm_started
+    with _warm_lock:
+        if _warm_started:
+            return
+        _warm_started = True
+
+    def _warm():
+        try:
+            _session.head("https://api.va.landing.ai/", timeout=(5, 5))
+        except requests.RequestException:
+            pass
+
+    threading.Thread(target=_warm, daemon=True, name="ocr-tls-warmup").start()
+
+class _RateLimiter:
+    """
+    Paces API calls to a minimum interval between sends.
+
+    Each caller reserves the next send slot under a lock and then sleeps
+    outside it, so workers queue up in arrival order without a
+    thundering-herd resubmit when the provider starts throttling.
+    """
+
+    def __init__(self, rps):
+        self._interval = 1.0 / rps
+        self._lock = threading.Lock()
+        self._next_at = 0.0
+
+    def _reserve(self):
+        """Claim the next slot; returns how long the caller must wait."""
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_at - now
+            self._next_at = max(now, self._next_at) + self._interval
+        return wait
+
+    def acquire(self):
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+# Shared limiter, created lazily from OCR_RPS (see _get_rate_limiter)
+_rate_limiter = None
+_rate_limiter_loaded = False
+_rate_limiter_lock = threading.Lock()
+
+def _get_rate_limiter():
+    """
+    Return the shared request pacer, or None when OCR_RPS is unset.
+
+    OCR_RPS caps outbound requests-per-second across every worker —
+    sync and async alike — so raising max_workers cannot blow through
+    the provider's rate limit.
+    """
+    global _rate_limiter, _rate_limiter_loaded
+    with _rate_limiter_lock:
+        if not _rate_limiter_loaded:
+            _rate_limiter_loaded = True
+            rps = float(os.getenv('OCR_RPS', '0') or '0')
+            if rps > 0:
+                _rate_limiter = _RateLimiter(rps)
+    return _rate_limiter
+
+def get_session():
+    """
+    Return the shared requests.Session used for API calls.
+
+    Returns:
+        requests.Session: The module-level session, so callers can
+        install custom auth or adapters before processing.
+    """
+    return _session
+
+# Shared HTTP/2 client, created lazily on first use (see _get_http2_client)
+_http2_client = None
+
+def _http2_enabled():
+    """Check whether the HTTP/2 transport should be used for sync API calls."""
+    return os.getenv('OCR_HTTP2') == '1'
+
+def _get_http2_client():
+    """
+    Return the shared httpx.Client with HTTP/2 enabled, creating it on first use.
+
+    HTTP/2 multiplexes concurrent page uploads over a single connection,
+    avoiding one TCP stream (and TLS handshake) per parallel worker.
+
+    Returns:
+        httpx.Client: The module-level HTTP/2 client.
+    """
+    global _http2_client
+    if _http2_client is None:
+        _http2_client = httpx.Client(
+            http2=True,
+            limits=httpx.Limits(max_connections=16, max_keepalive_connections=16),
+            timeout=httpx.Timeout(120.0, connect=5.0)
+        )
+    return _http2_client
 
 # Define the schema globally
 SCHEMA = {
@@ -96,106 +351,590 @@ SCHEMA = {
   ]
 }
 
+def _compact(node):
+    """Strip human-readable description/title keys from a schema tree."""
+    if isinstance(node, dict):
+        return {k: _compact(v) for k, v in node.items() if k not in ("description", "title")}
+    if isinstance(node, list):
+        return [_compact(x) for x in node]
+    return node
+
+# Serialize the schema once at import; orjson emits compact output, which
+# also halves the bytes sent with every API request versus default spacing.
+# OCR_COMPACT_SCHEMA=1 additionally strips descriptions/titles from the
+# wire copy — opt-in, because for this agentic endpoint the descriptions
+# double as extraction guidance and dropping them can change results.
+# SCHEMA itself stays intact as the source of truth.
+if os.getenv('OCR_COMPACT_SCHEMA') == '1':
+    _SCHEMA_JSON = orjson.dumps(_compact(SCHEMA)).decode()
+else:
+    _SCHEMA_JSON = orjson.dumps(SCHEMA).decode()
+
+# Schema fingerprint for cache keys, so cached results are invalidated
+# whenever the extraction schema changes
+_SCHEMA_HASH = hashlib.sha256(_SCHEMA_JSON.encode()).hexdigest()[:16]
+
+# Form payload shared by every (non-multipart-templated) API call
+_PAYLOAD = {"fields_schema": _SCHEMA_JSON}
+
+# The multipart envelope is identical for every upload except for the PDF
+# stream itself, so the boundary, the fields_schema part, and the closing
+# part are encoded exactly once at import instead of per request
+_MULTIPART_BOUNDARY = uuid.uuid4().hex
+_MULTIPART_CONTENT_TYPE = f"multipart/form-data; boundary={_MULTIPART_BOUNDARY}"
+_SCHEMA_PART = (
+    f"--{_MULTIPART_BOUNDARY}\r\n"
+    f"Content-Disposition: form-data; name=\"fields_schema\"\r\n\r\n"
+    f"{_SCHEMA_JSON}\r\n"
+).encode()
+_CLOSING_PART = f"\r\n--{_MULTIPART_BOUNDARY}--\r\n".encode()
+
+def _pdf_part_header(pdf_name):
+    """Build the multipart header bytes for the PDF part."""
+    return (
+        f"--{_MULTIPART_BOUNDARY}\r\n"
+        f"Content-Disposition: form-data; name=\"pdf\"; filename=\"{pdf_name}\"\r\n"
+        f"Content-Type: application/pdf\r\n\r\n"
+    ).encode()
+
+class _MultipartStream:
+    """
+    File-like multipart body that splices a PDF stream between the
+    pre-encoded schema and closing parts.
+
+    The body is never assembled in memory: read() drains the prebuilt
+    prefix, then the PDF file, then the closing boundary. The total
+    length is known up front (exposed as .len), so requests sends a
+    Content-Length header rather than chunked transfer encoding.
+
+    seek/tell are supported (every segment — BytesIO, file handle,
+    mmap — is seekable) so urllib3 can rewind the body before resending
+    on a retryable 429/5xx; without them a retry would replay an
+    already-exhausted stream as zero body bytes.
+    """
+
+    def __init__(self, pdf_name, pdf_file, pdf_size):
+        prefix = _SCHEMA_PART + _pdf_part_header(pdf_name)
+        self._segments = [io.BytesIO(prefix), pdf_file, io.BytesIO(_CLOSING_PART)]
+        self._sizes = [len(prefix), pdf_size, len(_CLOSING_PART)]
+        self._index = 0
+        self.len = len(prefix) + pdf_size + len(_CLOSING_PART)
+
+    def tell(self):
+        # Segment positions always sum to the logical stream position:
+        # drained segments sit at their end, pending ones at zero
+        return sum(segment.tell() for segment in self._segments)
+
+    def seek(self, pos, whence=0):
+        if whence == 1:
+            pos += self.tell()
+        elif whence == 2:
+            pos += self.len
+        if pos < 0:
+            raise ValueError(f"negative seek position {pos}")
+
+        offset = pos
+        for segment, size in zip(self._segments, self._sizes):
+            take = min(offset, size)
+            segment.seek(take)
+            offset -= take
+        self._index = 0
+        return pos
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            data = b"".join(segment.read() for segment in self._segments[self._index:])
+            self._index = len(self._segments)
+            return data
+
+        chunks = []
+        remaining = size
+        while remaining > 0 and self._index < len(self._segments):
+            chunk = self._segments[self._index].read(remaining)
+            if not chunk:
+                self._index += 1
+                continue
+            chunks.append(chunk)
+            remaining -= len(chunk)
+        return b"".join(chunks)
+
+def _maybe_compress_body(body):
+    """
+    Optionally compress an upload body for slow uplinks.
+
+    Disabled unless OCR_GZIP_UPLOAD=1 (the API must accept
+    Content-Encoding on the request body). Compression buffers the body
+    in memory, so it only pays off when upload bandwidth, not RAM, is
+    the bottleneck. PDFs typically shrink 10-30%; level 1 keeps the CPU
+    cost small. Set OCR_UPLOAD_CODEC=zstd (with zstandard installed)
+    for a better ratio on binary-heavy documents.
+
+    Args:
+        body (_MultipartStream): The multipart body to maybe compress
+
+    Returns:
+        tuple: (data, content_encoding) where content_encoding is None
+        when compression is disabled and data is the untouched stream
+    """
+    if os.getenv('OCR_GZIP_UPLOAD') != '1':
+        return body, None
+
+    raw = body.read()
+    if zstandard is not None and os.getenv('OCR_UPLOAD_CODEC') == 'zstd':
+        return zstandard.ZstdCompressor(level=1).compress(raw), 'zstd'
+    return gzip.compress(raw, compresslevel=1), 'gzip'
+
+def _hash_file(pdf_path):
+    """
+    Compute the SHA-256 hex digest of a file's contents.
+
+    Args:
+        pdf_path (str): Path to the file to hash
+
+    Returns:
+        str: Hex digest of the file bytes
+    """
+    # file_digest streams through OpenSSL's C layer (SHA-NI accelerated)
+    # and releases the GIL, unlike a Python-level read loop
+    with open(pdf_path, 'rb') as f:
+        return hashlib.file_digest(f, 'sha256').hexdigest()
+
+def _cache_enabled():
+    """Check whether the on-disk result cache is active."""
+    return os.getenv('OCR_CACHE_DISABLE') != '1'
+
+def _cache_file_for(digest):
+    """
+    Build the cache file path for a content digest.
+
+    Entries are sharded into 256 two-hex-char subdirectories so large
+    caches don't accumulate thousands of files in one directory.
+
+    Args:
+        digest (str): SHA-256 hex digest of the PDF bytes
+
+    Returns:
+        Path: Location of the cached result (may not exist yet)
+    """
+    cache_dir = Path(os.getenv('OCR_CACHE_DIR', '.ocr_cache'))
+    return cache_dir / digest[:2] / f"{digest}_{_SCHEMA_HASH}.json"
+
+def _cache_get(cache_file):
+    """Return the cached result dict, or None on a cache miss."""
+    if _cache_enabled() and cache_file.exists():
+        return orjson.loads(cache_file.read_bytes())
+    return None
+
+def _cache_put(cache_file, result):
+    """Store a successful extraction result in the on-disk cache."""
+    if not _cache_enabled():
+        return
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+
+    # Write via a temp file + atomic rename so concurrent workers never
+    # observe a truncated entry
+    fd, temp_path = tempfile.mkstemp(dir=cache_file.parent, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(orjson.dumps(result))
+        os.replace(temp_path, cache_file)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+# Hot in-process layer in front of the disk cache: a warm repeat call for
+# an unchanged file skips even the SHA-256 pass and the JSON re-load.
+# Keyed by path + mtime_ns so edited files miss, and by schema hash so a
+# schema change invalidates everything. LFU keeps the most-requested
+# documents resident when the cache fills.
+_MEM_CACHE = LFUCache(maxsize=512)
+_MEM_CACHE_LOCK = threading.Lock()
+
+def _mem_get(key):
+    with _MEM_CACHE_LOCK:
+        return _MEM_CACHE.get(key)
+
+def _mem_put(key, result):
+    with _MEM_CACHE_LOCK:
+        _MEM_CACHE[key] = result
+
+# In-flight requests keyed by file digest: when several threads ask for the
+# same document at once (e.g. duplicate pages fanned out to a thread pool),
+# only the first issues an API call — the rest wait on its Future.
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+def _claim_inflight(digest):
+    """Register interest in a digest.
+
+    Returns (future, owner): the owner performs the upload and must resolve
+    the future via _resolve_inflight; non-owners just wait on it.
+    """
+    with _inflight_lock:
+        future = _inflight.get(digest)
+        if future is not None:
+            return future, False
+        future = Future()
+        _inflight[digest] = future
+        return future, True
+
+def _resolve_inflight(digest, future, result, error):
+    """Publish the owner's outcome to any waiters and clear the slot."""
+    with _inflight_lock:
+        _inflight.pop(digest, None)
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+# Responses at least this large are parsed incrementally so that only the
+# extracted_schema subtree is materialized instead of the full response tree
+_STREAM_PARSE_MIN_BYTES = 1 << 20
+
+def _extract_schema_from_response(response):
+    """
+    Pull data.extracted_schema out of an API response.
+
+    Small responses are decoded in one orjson pass. Large bodies from a
+    streamed requests response are walked incrementally with ijson, so
+    CPU and memory are spent only on the subtree we keep.
+
+    Args:
+        response: HTTP response from the analysis endpoint
+
+    Returns:
+        dict: The extracted_schema payload
+
+    Raises:
+        KeyError: If the response doesn't contain data.extracted_schema
+    """
+    content_length = int(response.headers.get('Content-Length') or 0)
+
+    if ijson is not None and hasattr(response, 'raw') and content_length >= _STREAM_PARSE_MIN_BYTES:
+        response.raw.decode_content = True
+        extracted_info = next(ijson.items(response.raw, 'data.extracted_schema'), None)
+        if extracted_info is None:
+            raise KeyError('extracted_schema')
+        return extracted_info
+
+    return orjson.loads(response.content)["data"]["extracted_schema"]
+
+def _count_pages(pdf_path):
+    """
+    Return the number of pages in a PDF without splitting it.
+
+    Args:
+        pdf_path (str): Path to the PDF file
+
+    Raises:
+        FileNotFoundError: If the PDF file doesn't exist
+    """
+    try:
+        with open(pdf_path, 'rb') as file:
+            return len(PyPDF2.PdfReader(file).pages)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"PDF file not found: {pdf_path}")
+
 def split_pdf_by_pages(pdf_path):
     """
-    Split a PDF file into individual pages.
-    
+    Split a PDF file into individual per-page PDFs, held in memory.
+
+    Historically returned temp-file paths; pages now stay in memory as
+    bytes, which removes the write+reopen+unlink round-trip per page
+    (and the leaked temp files when a caller forgot to clean up).
+
     Args:
         pdf_path (str): Path to the PDF file to split
-        
+
     Returns:
-        list: List of temporary file paths for each page
-        
+        list: List of (page_num, page_bytes) tuples, 1-based
+
+    Raises:
+        FileNotFoundError: If the PDF file doesn't exist
+        Exception: If PDF processing fails
+    """
+    return split_pdf_to_bytes(pdf_path)
+
+def split_pdf_to_bytes(pdf_path):
+    """
+    Split a PDF into per-page PDF bytes, entirely in memory.
+
+    With pikepdf the source is opened once and each page is appended to
+    a fresh document by reference, so indirect objects are shared rather
+    than re-walked per page; without it, PyPDF2 serializes each page to
+    a BytesIO. Either way no temp files are written: a typical catalog
+    page is well under 500KB, so holding pages in memory is cheaper than
+    a write+reopen round-trip per page.
+
+    Args:
+        pdf_path (str): Path to the PDF file to split
+
+    Returns:
+        list: List of (page_num, page_bytes) tuples, 1-based
+
+    Raises:
+        FileNotFoundError: If the PDF file doesn't exist
+        Exception: If PDF processing fails
+    """
+    return list(split_pdf_iter(pdf_path))
+
+def split_pdf_iter(pdf_path):
+    """
+    Lazily yield (page_num, page_bytes) tuples, one split page at a time.
+
+    Generator form of split_pdf_to_bytes: consumers can start uploading
+    the first page while later pages are still being split, so
+    time-to-first-result doesn't grow with the page count.
+
+    Args:
+        pdf_path (str): Path to the PDF file to split
+
+    Yields:
+        tuple: (page_num, page_bytes), 1-based
+
     Raises:
         FileNotFoundError: If the PDF file doesn't exist
         Exception: If PDF processing fails
     """
-    if not os.path.exists(pdf_path):
-        raise FileNotFoundError(f"PDF file not found: {pdf_path}")
-    
-    page_files = []
-    
     try:
-        with open(pdf_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            total_pages = len(pdf_reader.pages)
-            
-            logger.info(f"Splitting PDF with {total_pages} pages")
-            
-            for page_num in range(total_pages):
-                # Create a temporary file for this page
-                temp_file = tempfile.NamedTemporaryFile(suffix='.pdf', delete=False)
-                temp_path = temp_file.name
-                temp_file.close()
-                
-                # Create a PDF writer for this page
-                pdf_writer = PyPDF2.PdfWriter()
-                pdf_writer.add_page(pdf_reader.pages[page_num])
-                
-                # Write the page to the temporary file
-                with open(temp_path, 'wb') as output_file:
-                    pdf_writer.write(output_file)
-                
-                page_files.append((page_num + 1, temp_path))  # page_num + 1 for 1-based indexing
-                logger.info(f"Created page {page_num + 1} at {temp_path}")
-                
+        if pikepdf is not None:
+            with pikepdf.open(pdf_path) as src:
+                logger.info(f"Splitting PDF with {len(src.pages)} pages")
+                for i, page in enumerate(src.pages):
+                    dst = pikepdf.Pdf.new()
+                    dst.pages.append(page)
+                    buf = io.BytesIO()
+                    dst.save(buf)
+                    yield i + 1, buf.getvalue()
+        else:
+            with open(pdf_path, 'rb') as file:
+                pdf_reader = PyPDF2.PdfReader(file)
+                logger.info(f"Splitting PDF with {len(pdf_reader.pages)} pages")
+                # One scratch buffer for every page; PyPDF2's writer pages
+                # can't be cleared (3.0.1 _VirtualList), so the writer
+                # itself still has to be rebuilt per page
+                buf = io.BytesIO()
+                for i, page in enumerate(pdf_reader.pages):
+                    pdf_writer = PyPDF2.PdfWriter()
+                    pdf_writer.add_page(page)
+                    buf.seek(0)
+                    buf.truncate()
+                    pdf_writer.write(buf)
+                    yield i + 1, buf.getvalue()
+    except FileNotFoundError:
+        raise FileNotFoundError(f"PDF file not found: {pdf_path}")
     except Exception as e:
-        # Clean up any temporary files created so far
-        for _, temp_path in page_files:
-            try:
-                os.unlink(temp_path)
-            except:
-                pass
         raise Exception(f"Failed to split PDF: {e}")
-    
-    return page_files
 
-def process_document(pdf_path, page_num=None):
+def process_document(pdf_path, page_num=None, pdf_name=None):
     """
     Process a PDF document using Landing AI's Vision Agent API.
-    
+
     Args:
         pdf_path (str): Path to the PDF file to process
         page_num (int, optional): Page number being processed (for logging)
-        
+        pdf_name (str, optional): Display name for the upload; derived from
+            pdf_path when omitted, so callers that already know the basename
+            can skip the extra path split
+
     Returns:
         dict: Extracted product information in JSON format
-        
+
     Raises:
         FileNotFoundError: If the PDF file doesn't exist
         ValueError: If API key is missing or invalid
         requests.RequestException: If API request fails
     """
-    
-    # Check if file exists
-    if not os.path.exists(pdf_path):
-        raise FileNotFoundError(f"PDF file not found: {pdf_path}")
-    
-    # Get file name from path
-    pdf_name = os.path.basename(pdf_path)
-    
+    _lazy_warm()
+
+    if pdf_name is None:
+        pdf_name = os.path.basename(pdf_path)
+
     page_info = f" (Page {page_num})" if page_num else ""
     logger.info(f"Processing document: {pdf_name}{page_info}")
-    
-    headers = {"Authorization": f"Basic {VA_API_KEY}"}
-    url = "https://api.va.landing.ai/v1/tools/agentic-document-analysis"
 
-    files = [
-        ("pdf", (pdf_name, open(pdf_path, "rb"), "application/pdf")),
-    ]
+    # Fastest path first: an in-process hit costs one stat + dict lookup,
+    # no hashing and no file read
+    mem_key = None
+    if _cache_enabled():
+        try:
+            mem_key = (pdf_path, os.stat(pdf_path).st_mtime_ns, _SCHEMA_HASH)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"PDF file not found: {pdf_path}")
+        cached = _mem_get(mem_key)
+        if cached is not None:
+            logger.info(f"Memory cache hit for {pdf_name}{page_info}")
+            return cached
 
-    payload = {"fields_schema": json.dumps(SCHEMA)}
+    # Re-runs over an unchanged PDF + schema are answered from the on-disk
+    # cache in microseconds instead of a full API round-trip. Hashing is
+    # also the existence check: letting open() raise avoids a separate
+    # stat per call (EAFP).
+    try:
+        digest = _hash_file(pdf_path)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"PDF file not found: {pdf_path}")
+    cache_file = _cache_file_for(digest)
+    cached = _cache_get(cache_file)
+    if cached is not None:
+        logger.info(f"Cache hit for {pdf_name}{page_info}")
+        if mem_key is not None:
+            _mem_put(mem_key, cached)
+        return cached
+
+    headers = _get_auth_headers()
+    url = API_URL
+
+    # Piggyback on an identical upload already in flight from another
+    # thread. Claimed only after header construction: anything that can
+    # raise between the claim and the resolving try block would leak an
+    # unresolved future and hang every later call for the same digest.
+    future, owner = _claim_inflight(digest)
+    if not owner:
+        logger.info(f"Coalesced duplicate request for {pdf_name}{page_info}")
+        return future.result()
 
     try:
-        response = requests.request("POST", url, headers=headers, files=files, data=payload)
-        response.raise_for_status()  # Raise exception for bad status codes
-        
-        output_data = response.json()["data"]
-        extracted_info = output_data["extracted_schema"]
-        
+        with open(pdf_path, "rb") as pdf_file:
+            # Serve the multipart body from an mmap of the file: the kernel
+            # pages bytes straight into the socket buffers instead of each
+            # parallel worker holding its own userspace copy of the PDF.
+            # Empty files can't be mapped, so fall back to the raw handle.
+            pdf_size = os.fstat(pdf_file.fileno()).st_size
+            if pdf_size:
+                source = mmap.mmap(pdf_file.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                source = pdf_file
+            try:
+                body = _MultipartStream(pdf_name, source, pdf_size)
+                upload_headers = {**headers, "Content-Type": _MULTIPART_CONTENT_TYPE}
+
+                body, content_encoding = _maybe_compress_body(body)
+                if content_encoding:
+                    upload_headers["Content-Encoding"] = content_encoding
+
+                limiter = _get_rate_limiter()
+                if limiter is not None:
+                    limiter.acquire()
+
+                if _http2_enabled():
+                    try:
+                        client = _get_http2_client()
+                        for attempt in range(_HTTPX_RETRY_TOTAL + 1):
+                            if attempt and limiter is not None:
+                                limiter.acquire()
+                            # Rebuild the content per attempt: the stream is
+                            # rewound so a retry resends the full body
+                            if isinstance(body, bytes):
+                                content = body
+                            else:
+                                body.seek(0)
+                                content = iter(lambda: body.read(65536), b"")
+                            response = client.post(url, headers=upload_headers, content=content)
+                            if response.status_code in _RETRY_STATUSES and attempt < _HTTPX_RETRY_TOTAL:
+                                delay = _httpx_retry_delay(response, attempt)
+                                logger.warning(f"Retrying {pdf_name}{page_info} after status "
+                                               f"{response.status_code} in {delay:.1f}s")
+                                time.sleep(delay)
+                                continue
+                            response.raise_for_status()
+                            break
+                    except httpx.HTTPError as e:
+                        # Normalize to the requests exception hierarchy callers already handle
+                        raise requests.RequestException(e)
+                else:
+                    # stream=True defers body download so large responses can be
+                    # parsed incrementally instead of buffered whole
+                    response = _session.post(url, headers=upload_headers, data=body,
+                                             timeout=_TIMEOUT, stream=True)
+                    response.raise_for_status()  # Raise exception for bad status codes
+            finally:
+                if source is not pdf_file:
+                    source.close()
+
+        try:
+            extracted_info = _extract_schema_from_response(response)
+        finally:
+            response.close()
+
+        _cache_put(cache_file, extracted_info)
+        if mem_key is not None:
+            _mem_put(mem_key, extracted_info)
+        logger.info(f"Successfully processed {pdf_name}{page_info}")
+
+    except requests.RequestException as e:
+        error = requests.RequestException(f"API request failed for {pdf_name}{page_info}: {e}")
+        _resolve_inflight(digest, future, None, error)
+        raise error
+    except KeyError as e:
+        error = ValueError(f"Unexpected API response format for {pdf_name}{page_info}: {e}")
+        _resolve_inflight(digest, future, None, error)
+        raise error
+    except json.JSONDecodeError as e:
+        error = ValueError(f"Invalid JSON response from API for {pdf_name}{page_info}: {e}")
+        _resolve_inflight(digest, future, None, error)
+        raise error
+    except BaseException as e:
+        _resolve_inflight(digest, future, None, e)
+        raise
+
+    _resolve_inflight(digest, future, extracted_info, None)
+    return extracted_info
+
+def _post_pdf_bytes(pdf_name, pdf_bytes, page_num=None):
+    """
+    Upload in-memory PDF bytes to the analysis API (sync path).
+
+    Thread-based mirror of _post_pdf_bytes_async: cache-aware and
+    rate-limited, with no temp file between splitter and socket.
+
+    Args:
+        pdf_name (str): Display name for the uploaded page
+        pdf_bytes (bytes): Single-page PDF content
+        page_num (int, optional): Page number being processed (for logging)
+
+    Returns:
+        dict: Extracted product information in JSON format
+
+    Raises:
+        requests.RequestException: If API request fails
+        ValueError: If the API response has an unexpected format
+    """
+    page_info = f" (Page {page_num})" if page_num else ""
+
+    cache_file = _cache_file_for(hashlib.sha256(pdf_bytes).hexdigest())
+    cached = _cache_get(cache_file)
+    if cached is not None:
+        logger.info(f"Cache hit for {pdf_name}{page_info}")
+        return cached
+
+    body = _MultipartStream(pdf_name, io.BytesIO(pdf_bytes), len(pdf_bytes))
+    upload_headers = {**_get_auth_headers(), "Content-Type": _MULTIPART_CONTENT_TYPE}
+    body, content_encoding = _maybe_compress_body(body)
+    if content_encoding:
+        upload_headers["Content-Encoding"] = content_encoding
+
+    limiter = _get_rate_limiter()
+    if limiter is not None:
+        limiter.acquire()
+
+    try:
+        response = _session.post(API_URL, headers=upload_headers, data=body,
+                                 timeout=_TIMEOUT, stream=True)
+        response.raise_for_status()
+
+        try:
+            extracted_info = _extract_schema_from_response(response)
+        finally:
+            response.close()
+
+        _cache_put(cache_file, extracted_info)
         logger.info(f"Successfully processed {pdf_name}{page_info}")
         return extracted_info
-        
+
     except requests.RequestException as e:
         raise requests.RequestException(f"API request failed for {pdf_name}{page_info}: {e}")
     except KeyError as e:
@@ -206,27 +945,204 @@ def process_document(pdf_path, page_num=None):
 def process_page_parallel(page_info):
     """
     Process a single page in parallel.
-    
+
     Args:
-        page_info (tuple): Tuple of (page_num, temp_file_path)
-        
+        page_info (tuple): Tuple of (page_num, page_bytes)
+
     Returns:
         tuple: (page_num, result_dict) or (page_num, error_message)
     """
-    page_num, temp_path = page_info
-    
+    page_num, page_bytes = page_info
+
     try:
-        result = process_document(temp_path, page_num)
+        result = _post_pdf_bytes(f"page_{page_num:03d}.pdf", page_bytes, page_num)
         return (page_num, result)
     except Exception as e:
         logger.error(f"Error processing page {page_num}: {e}")
         return (page_num, {"error": str(e)})
-    finally:
-        # Clean up temporary file
+
+async def _post_pdf_bytes_async(client, pdf_name, pdf_bytes, page_num=None):
+    """
+    Upload PDF bytes to the analysis API and return the extracted schema.
+
+    Core of the async path: cache-aware, shared by both the in-memory
+    page pipeline and the file-based process_document_async.
+
+    Args:
+        client (httpx.AsyncClient): Shared async HTTP client
+        pdf_name (str): File name to report in the multipart upload
+        pdf_bytes (bytes): The PDF content to upload
+        page_num (int, optional): Page number being processed (for logging)
+
+    Returns:
+        dict: Extracted product information in JSON format
+
+    Raises:
+        requests.RequestException: If API request fails
+        ValueError: If the API response has an unexpected format
+    """
+    page_info = f" (Page {page_num})" if page_num else ""
+    logger.info(f"Processing document: {pdf_name}{page_info}")
+
+    cache_file = _cache_file_for(hashlib.sha256(pdf_bytes).hexdigest())
+    cached = _cache_get(cache_file)
+    if cached is not None:
+        logger.info(f"Cache hit for {pdf_name}{page_info}")
+        return cached
+
+    try:
+        for attempt in range(_HTTPX_RETRY_TOTAL + 1):
+            limiter = _get_rate_limiter()
+            if limiter is not None:
+                await limiter.acquire_async()
+
+            response = await client.post(
+                API_URL,
+                headers=_get_auth_headers(),
+                files={"pdf": (pdf_name, pdf_bytes, "application/pdf")},
+                data=_PAYLOAD,
+            )
+            if response.status_code in _RETRY_STATUSES and attempt < _HTTPX_RETRY_TOTAL:
+                delay = _httpx_retry_delay(response, attempt)
+                logger.warning(f"Retrying {pdf_name}{page_info} after status "
+                               f"{response.status_code} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+            response.raise_for_status()
+            break
+
+        extracted_info = _extract_schema_from_response(response)
+
+        _cache_put(cache_file, extracted_info)
+        logger.info(f"Successfully processed {pdf_name}{page_info}")
+        return extracted_info
+
+    except httpx.HTTPError as e:
+        raise requests.RequestException(f"API request failed for {pdf_name}{page_info}: {e}")
+    except KeyError as e:
+        raise ValueError(f"Unexpected API response format for {pdf_name}{page_info}: {e}")
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid JSON response from API for {pdf_name}{page_info}: {e}")
+
+async def process_document_async(client, pdf_path, page_num=None):
+    """
+    Process a PDF document using Landing AI's Vision Agent API (async).
+
+    Args:
+        client (httpx.AsyncClient): Shared async HTTP client
+        pdf_path (str): Path to the PDF file to process
+        page_num (int, optional): Page number being processed (for logging)
+
+    Returns:
+        dict: Extracted product information in JSON format
+
+    Raises:
+        FileNotFoundError: If the PDF file doesn't exist
+        requests.RequestException: If API request fails
+        ValueError: If the API response has an unexpected format
+    """
+    # Read the page off the event loop so concurrent uploads keep flowing
+    # while this one waits on disk
+    try:
+        if aiofiles is not None:
+            async with aiofiles.open(pdf_path, 'rb') as pdf_file:
+                pdf_bytes = await pdf_file.read()
+        else:
+            pdf_bytes = await asyncio.to_thread(Path(pdf_path).read_bytes)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"PDF file not found: {pdf_path}")
+
+    return await _post_pdf_bytes_async(client, os.path.basename(pdf_path), pdf_bytes, page_num)
+
+# Pages buffered between the splitter and the upload workers. A bounded
+# queue gives back-pressure: splitting stalls once this many pages are
+# waiting, so memory stays flat no matter how large the document is.
+_PAGE_QUEUE_MAXSIZE = 32
+
+async def _gather_pages(pages, max_workers, on_result=None):
+    """
+    Upload all pages over a shared HTTP/2 connection pool.
+
+    Pages flow through a bounded queue into a fixed pool of consumer
+    tasks, so only ``max_workers`` uploads are in flight and at most
+    ``_PAGE_QUEUE_MAXSIZE`` split pages are held in memory at once —
+    the producer blocks until the consumers drain.
+
+    Args:
+        pages (iterable): Iterable of (page_num, page_bytes) tuples
+        max_workers (int): Maximum number of concurrent uploads
+        on_result (callable, optional): Called as on_result(page_num,
+            result) the moment each page completes; its return value is
+            retained instead of the full result, so callers can persist
+            the payload and keep only a lightweight record in memory
+
+    Returns:
+        dict: Mapping of page_num to result dict (or to whatever
+        on_result returned for it)
+    """
+    limits = httpx.Limits(max_connections=max_workers, max_keepalive_connections=max_workers)
+    timeout = httpx.Timeout(120.0, connect=5.0)
+
+    queue = asyncio.Queue(maxsize=_PAGE_QUEUE_MAXSIZE)
+    results = {}
+
+    async def produce():
+        it = iter(pages)
         try:
-            os.unlink(temp_path)
-        except:
-            pass
+            while True:
+                # next() runs in a worker thread: pikepdf releases the GIL
+                # while saving, so splitting genuinely overlaps the uploads
+                # already in flight instead of serializing before them
+                page = await asyncio.to_thread(next, it, None)
+                if page is None:
+                    break
+                await queue.put(page)
+        finally:
+            # One sentinel per consumer so every worker shuts down cleanly.
+            # This must happen even when the splitter raises mid-document,
+            # otherwise consumers that were mid-upload would park on
+            # queue.get() forever and the pipeline would hang instead of
+            # surfacing the split error.
+            for _ in range(max_workers):
+                await queue.put(None)
+
+    async def consume(client):
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            page_num, page_bytes = item
+            try:
+                result = await _post_pdf_bytes_async(
+                    client, f"page_{page_num:03d}.pdf", page_bytes, page_num)
+            except Exception as e:
+                logger.error(f"Error processing page {page_num}: {e}")
+                result = {"error": str(e)}
+            if on_result is not None:
+                result = on_result(page_num, result)
+            results[page_num] = result
+
+    async with httpx.AsyncClient(http2=True, limits=limits, timeout=timeout) as client:
+        await asyncio.gather(produce(), *[consume(client) for _ in range(max_workers)])
+
+    return results
+
+def _run_async(coro):
+    """
+    Drive a coroutine to completion on a fresh event loop.
+
+    Uses uvloop's loop implementation when available, scoped to this one
+    run — installing it globally at import time would silently change the
+    event-loop policy for any program that merely imports this module.
+    """
+    if uvloop is not None:
+        with asyncio.Runner(loop_factory=uvloop.new_event_loop) as runner:
+            return runner.run(coro)
+    return asyncio.run(coro)
+
+# Characters not safe for a directory name; compiled once so sanitizing
+# runs in C instead of a per-character Python loop
+_SAFE_RE = re.compile(r'[^A-Za-z0-9._-]')
 
 def create_output_directory(pdf_filename=None):
     """
@@ -242,9 +1158,7 @@ def create_output_directory(pdf_filename=None):
     
     if pdf_filename:
         # Remove extension and sanitize filename for directory name
-        filename_without_ext = Path(pdf_filename).stem
-        # Replace any problematic characters with underscores
-        safe_filename = "".join(c if c.isalnum() or c in "._-" else "_" for c in filename_without_ext)
+        safe_filename = _SAFE_RE.sub('_', Path(pdf_filename).stem)
         output_dir = Path(f"output/{timestamp}-{safe_filename}")
     else:
         output_dir = Path(f"output/{timestamp}")
@@ -254,10 +1168,42 @@ def create_output_directory(pdf_filename=None):
     logger.info(f"Created output directory: {output_dir}")
     return output_dir
 
+class _Product(msgspec.Struct):
+    """
+    Typed view of one extracted product for summary rendering.
+
+    msgspec.convert maps the raw API dicts onto C-backed structs in one
+    pass — attribute access afterwards is a slot read instead of a dict
+    lookup plus default materialization per field. Hyphenated schema
+    field names are renamed to attribute-safe equivalents.
+    """
+    id: str = "N/A"
+    name: str = "N/A"
+    size: str = "N/A"
+    price: float | str = "N/A"
+    flower_data: str = msgspec.field(default="N/A", name="flower-data")
+    foliage_data: str = msgspec.field(default="N/A", name="foliage-data")
+    dimensions: str = "N/A"
+    construction_material: str = msgspec.field(default="N/A", name="construction-material")
+
+# Per-product block for page summary files, formatted once per product
+# via attribute access on the msgspec struct
+_SUMMARY_PRODUCT_TMPL = (
+    "Product {i}:\n"
+    "  ID: {p.id}\n"
+    "  Name: {p.name}\n"
+    "  Size: {p.size}\n"
+    "  Price: ${p.price}\n"
+    "  Flower Data: {p.flower_data}\n"
+    "  Foliage Data: {p.foliage_data}\n"
+    "  Dimensions: {p.dimensions}\n"
+    "  Construction Material: {p.construction_material}\n\n"
+)
+
 def save_page_result(output_dir, page_num, result):
     """
     Save the result for a specific page to a numbered directory.
-    
+
     Args:
         output_dir (Path): Base output directory
         page_num (int): Page number
@@ -265,36 +1211,78 @@ def save_page_result(output_dir, page_num, result):
     """
     page_dir = output_dir / f"{page_num:03d}"  # Zero-padded 3-digit page number
     page_dir.mkdir(exist_ok=True)
-    
+
     # Save the result as JSON
     result_file = page_dir / "result.json"
     with open(result_file, 'w') as f:
         json.dump(result, f, indent=2)
-    
-    # Save a summary text file
-    summary_file = page_dir / "summary.txt"
-    with open(summary_file, 'w') as f:
-        f.write(f"Page {page_num} Processing Results\n")
-        f.write("=" * 40 + "\n\n")
-        
-        if "error" in result:
-            f.write(f"ERROR: {result['error']}\n")
-        else:
-            f.write(f"Number of products found: {len(result.get('products', []))}\n\n")
-            
-            for i, product in enumerate(result.get('products', []), 1):
-                f.write(f"Product {i}:\n")
-                f.write(f"  ID: {product.get('id', 'N/A')}\n")
-                f.write(f"  Name: {product.get('name', 'N/A')}\n")
-                f.write(f"  Size: {product.get('size', 'N/A')}\n")
-                f.write(f"  Price: ${product.get('price', 'N/A')}\n")
-                f.write(f"  Flower Data: {product.get('flower-data', 'N/A')}\n")
-                f.write(f"  Foliage Data: {product.get('foliage-data', 'N/A')}\n")
-                f.write(f"  Dimensions: {product.get('dimensions', 'N/A')}\n")
-                f.write(f"  Construction Material: {product.get('construction-material', 'N/A')}\n\n")
-    
+
+    # Assemble the summary in one buffer and write it in a single call
+    # instead of a dozen small f.write round-trips per product
+    parts = [f"Page {page_num} Processing Results\n", "=" * 40 + "\n\n"]
+
+    if "error" in result:
+        parts.append(f"ERROR: {result['error']}\n")
+    else:
+        raw_products = result.get('products', [])
+        try:
+            products = msgspec.convert(raw_products, list[_Product])
+        except msgspec.ValidationError:
+            # The payload is LLM-extracted, not schema-guaranteed: a null
+            # price or numeric id must render as-is (like the old .get
+            # chains did), not fail the page. Direct construction skips
+            # validation, so ill-typed values pass straight through.
+            products = [_Product(
+                id=p.get('id', 'N/A'),
+                name=p.get('name', 'N/A'),
+                size=p.get('size', 'N/A'),
+                price=p.get('price', 'N/A'),
+                flower_data=p.get('flower-data', 'N/A'),
+                foliage_data=p.get('foliage-data', 'N/A'),
+                dimensions=p.get('dimensions', 'N/A'),
+                construction_material=p.get('construction-material', 'N/A'),
+            ) for p in raw_products]
+        parts.append(f"Number of products found: {len(products)}\n\n")
+        parts.extend(_SUMMARY_PRODUCT_TMPL.format(i=i, p=p)
+                     for i, p in enumerate(products, 1))
+
+    (page_dir / "summary.txt").write_text("".join(parts))
+
     logger.info(f"Saved results for page {page_num} to {page_dir}")
 
+def _result_writer_loop(write_queue, combined, output_dir, write_per_page, errors):
+    """
+    Drain encoded page results onto disk from a single thread.
+
+    Keeping one sequential writer means upload workers never block on
+    file I/O or contend over the combined results file — they just
+    enqueue pre-encoded bytes. A None sentinel terminates the loop.
+
+    Failures on one item are logged and collected rather than allowed
+    to kill the thread: the queue must keep draining (a dead writer
+    would deadlock the bounded puts upstream), and the caller re-raises
+    the first collected error after join so nothing fails silently.
+
+    Args:
+        write_queue (queue.Queue): Queue of (page_num, encoded, result)
+        combined (file): Open binary handle for combined_results.jsonl
+        output_dir (Path): Base output directory for per-page dirs
+        write_per_page (bool): Whether every page gets a per-page dir
+        errors (list): Sink for exceptions raised while writing
+    """
+    while True:
+        item = write_queue.get()
+        if item is None:
+            return
+        page_num, encoded, result = item
+        try:
+            combined.write(encoded)
+            if write_per_page or "error" in result:
+                save_page_result(output_dir, page_num, result)
+        except Exception as e:
+            logger.error(f"Failed to write results for page {page_num}: {e}")
+            errors.append(e)
+
 def process_pdf_by_pages(pdf_path, max_workers=4):
     """
     Process a PDF by splitting it into pages and processing each page in parallel.
@@ -302,10 +1290,13 @@ def process_pdf_by_pages(pdf_path, max_workers=4):
     Args:
         pdf_path (str): Path to the PDF file to process
         max_workers (int): Maximum number of parallel workers
-        
+
     Returns:
-        dict: Summary of processing results
+        dict: Summary of processing results. ``results`` maps each page
+        to a lightweight ``{"product_count": n}`` or ``{"error": msg}``
+        record; full extractions live in combined_results.jsonl.
     """
+    _lazy_warm()
     logger.info(f"Starting PDF processing: {pdf_path}")
     
     # Get filename for output directory
@@ -313,77 +1304,97 @@ def process_pdf_by_pages(pdf_path, max_workers=4):
     
     # Create output directory
     output_dir = create_output_directory(pdf_filename)
-    
-    # Split PDF into pages
-    page_files = split_pdf_by_pages(pdf_path)
-    
-    if not page_files:
+
+    # Fast path: a single-page document needs no splitting, temp files,
+    # or event-loop fan-out — it is exactly one API call
+    total_pages = _count_pages(pdf_path)
+    if total_pages == 0:
         logger.warning("No pages found in PDF")
         return {"error": "No pages found in PDF"}
-    
-    logger.info(f"Processing {len(page_files)} pages with {max_workers} workers")
-    
-    # Process pages in parallel
-    results = {}
-    successful_pages = 0
-    failed_pages = 0
-    
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        # Submit all pages for processing
-        future_to_page = {executor.submit(process_page_parallel, page_info): page_info[0] 
-                         for page_info in page_files}
-        
-        # Collect results as they complete
-        for future in as_completed(future_to_page):
-            page_num, result = future.result()
-            results[page_num] = result
-            
-            # Save result to file
-            save_page_result(output_dir, page_num, result)
-            
-            # Update counters
-            if "error" in result:
-                failed_pages += 1
-            else:
-                successful_pages += 1
-    
-    # Create summary file
-    summary_file = output_dir / "processing_summary.txt"
-    with open(summary_file, 'w') as f:
-        f.write(f"PDF Processing Summary\n")
-        f.write("=" * 30 + "\n\n")
-        f.write(f"Input PDF: {pdf_path}\n")
-        f.write(f"Total pages: {len(page_files)}\n")
-        f.write(f"Successful pages: {successful_pages}\n")
-        f.write(f"Failed pages: {failed_pages}\n")
-        f.write(f"Processing completed: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
-        
-        for page_num in sorted(results.keys()):
-            result = results[page_num]
+    write_per_page = os.getenv('OCR_WRITE_PER_PAGE') == '1'
+
+    # Results are persisted to combined_results.jsonl the moment each page
+    # finishes and only a {product_count}/{error} stub is kept in memory,
+    # so resident size stays flat no matter how rich the extractions are.
+    # Per-page directories stay available behind OCR_WRITE_PER_PAGE=1, and
+    # failed pages always get one so errors remain easy to spot on disk.
+    combined_file = output_dir / "combined_results.jsonl"
+    with open(combined_file, 'wb') as f:
+        # All file writes funnel through one thread; workers only encode
+        # (orjson, in C) and enqueue, so they stay on the network
+        write_queue = queue.Queue(maxsize=64)
+        writer_errors = []
+        writer = threading.Thread(target=_result_writer_loop,
+                                  args=(write_queue, f, output_dir, write_per_page, writer_errors),
+                                  name="ocr-result-writer")
+        writer.start()
+
+        def record_result(page_num, result):
+            write_queue.put((page_num,
+                             orjson.dumps({"page": page_num, "result": result},
+                                          option=orjson.OPT_APPEND_NEWLINE),
+                             result))
             if "error" in result:
-                f.write(f"Page {page_num}: ERROR - {result['error']}\n")
+                return {"error": result["error"]}
+            return {"product_count": len(result.get('products', []))}
+
+        try:
+            if total_pages == 1:
+                logger.info("Single-page PDF detected, processing directly")
+                try:
+                    results = {1: record_result(1, process_document(pdf_path, 1))}
+                except Exception as e:
+                    logger.error(f"Error processing page 1: {e}")
+                    results = {1: record_result(1, {"error": str(e)})}
             else:
-                f.write(f"Page {page_num}: SUCCESS - {len(result.get('products', []))} products found\n")
-    
-    # Create combined results file
-    combined_file = output_dir / "combined_results.json"
-    with open(combined_file, 'w') as f:
-        json.dump({
-            "summary": {
-                "total_pages": len(page_files),
-                "successful_pages": successful_pages,
-                "failed_pages": failed_pages,
-                "processing_timestamp": datetime.now().isoformat()
-            },
-            "page_results": results
-        }, f, indent=2)
-    
+                logger.info(f"Processing {total_pages} pages with up to {max_workers} concurrent uploads")
+
+                # Pages are split lazily and uploaded as they appear, so the
+                # first request leaves before the last page has been split
+                results = _run_async(_gather_pages(split_pdf_iter(pdf_path),
+                                                   max_workers, on_result=record_result))
+        finally:
+            write_queue.put(None)
+            writer.join()
+
+        # A write failure means results are missing on disk — surface it
+        # instead of reporting the run as successful
+        if writer_errors:
+            raise writer_errors[0]
+
+    successful_pages = 0
+    failed_pages = 0
+    for result in results.values():
+        if "error" in result:
+            failed_pages += 1
+        else:
+            successful_pages += 1
+
+    # Create summary file in one buffered pass
+    lines = [
+        "PDF Processing Summary\n",
+        "=" * 30 + "\n\n",
+        f"Input PDF: {pdf_path}\n",
+        f"Total pages: {total_pages}\n",
+        f"Successful pages: {successful_pages}\n",
+        f"Failed pages: {failed_pages}\n",
+        f"Processing completed: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n",
+    ]
+    for page_num in sorted(results.keys()):
+        result = results[page_num]
+        if "error" in result:
+            lines.append(f"Page {page_num}: ERROR - {result['error']}\n")
+        else:
+            lines.append(f"Page {page_num}: SUCCESS - {result.get('product_count', 0)} products found\n")
+    (output_dir / "processing_summary.txt").write_text("".join(lines))
+
+
     logger.info(f"Processing complete. Results saved to: {output_dir}")
     logger.info(f"Summary: {successful_pages} successful, {failed_pages} failed")
     
     return {
         "output_directory": str(output_dir),
-        "total_pages": len(page_files),
+        "total_pages": total_pages,
         "successful_pages": successful_pages,
         "failed_pages": failed_pages,
         "results": results
@@ -430,31 +1441,38 @@ def handle_document(pdf_path):
     except Exception as e:
         print(f"Error processing document: {e}")
 
+# Per-product display template, compiled once; hyphenated schema field
+# names are valid format_map keys
+_PRODUCT_TMPL = (
+    "\nProduct {i}:\n"
+    "  ID: {id}\n"
+    "  Name: {name}\n"
+    "  Size: {size}\n"
+    "  Price: ${price}\n"
+    "  Flower Data: {flower-data}\n"
+    "  Foliage Data: {foliage-data}\n"
+    "  Dimensions: {dimensions}\n"
+    "  Construction Material: {construction-material}"
+)
+
 def handle_result(result):
     """Legacy function for backward compatibility."""
-    print("=== YOUR DESIRED OUTPUT ===")
-    print(json.dumps(result, indent=2))
-
-    # Print detailed information about the extracted products
-    print("\n=== EXTRACTED PRODUCTS ===")
+    print("=== EXTRACTED PRODUCTS ===")
     print(f"Number of products found: {len(result['products'])}")
 
-    # Print formatted JSON
-    print("\n=== FORMATTED JSON OUTPUT ===")
-    print(json.dumps(result, indent=2))
+    # Pretty-printing the whole result allocates a large transient string,
+    # so the JSON dump is opt-in for debugging sessions only
+    if os.getenv('OCR_VERBOSE') == '1':
+        print("\n=== FORMATTED JSON OUTPUT ===")
+        print(orjson.dumps(result, option=orjson.OPT_INDENT_2).decode())
 
-    # Print each product separately for better readability
+    # Print each product separately for better readability; one template
+    # application per product, batched into a single write
     print("\n=== INDIVIDUAL PRODUCTS ===")
-    for i, product in enumerate(result['products'], 1):
-        print(f"\nProduct {i}:")
-        print(f"  ID: {product['id']}")
-        print(f"  Name: {product['name']}")
-        print(f"  Size: {product['size']}")
-        print(f"  Price: ${product['price']}")
-        print(f"  Flower Data: {product['flower-data']}")
-        print(f"  Foliage Data: {product['foliage-data']}")
-        print(f"  Dimensions: {product['dimensions']}")
-        print(f"  Construction Material: {product['construction-material']}")
+    lines = [_PRODUCT_TMPL.format_map({**product, "i": i})
+             for i, product in enumerate(result['products'], 1)]
+    if lines:
+        sys.stdout.write("\n".join(lines) + "\n")
 
 if __name__ == "__main__":
     main()
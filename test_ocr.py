@@ -9,50 +9,47 @@ requiring actual API calls or PDF files.
 import os
 import tempfile
 import json
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import Mock, patch, MagicMock, AsyncMock
 from pathlib import Path
 
 def test_pdf_splitting():
-    """Test PDF splitting functionality."""
+    """Test PDF splitting returns in-memory page bytes."""
     print("Testing PDF splitting...")
-    
+
     # Mock PDF file
     mock_pdf_content = b"%PDF-1.4\n%Test PDF content"
-    
+
     with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as temp_pdf:
         temp_pdf.write(mock_pdf_content)
         temp_pdf_path = temp_pdf.name
-    
+
     try:
-        # Mock PyPDF2
+        # Mock PyPDF2 (force the fallback path by disabling pikepdf)
         mock_page = Mock()
         mock_reader = Mock()
         mock_reader.pages = [mock_page, mock_page]  # 2 pages
-        
-        with patch('ocr.PyPDF2.PdfReader', return_value=mock_reader):
-            with patch('ocr.PyPDF2.PdfWriter') as mock_writer_class:
-                mock_writer = Mock()
-                mock_writer_class.return_value = mock_writer
-                
-                # Import and test the function
-                from ocr import split_pdf_by_pages
-                
-                result = split_pdf_by_pages(temp_pdf_path)
-                
-                # Verify results
-                assert len(result) == 2, f"Expected 2 pages, got {len(result)}"
-                assert result[0][0] == 1, "First page should be numbered 1"
-                assert result[1][0] == 2, "Second page should be numbered 2"
-                
-                print("✓ PDF splitting test passed")
-                
-                # Clean up temporary files
-                for _, temp_path in result:
-                    try:
-                        os.unlink(temp_path)
-                    except:
-                        pass
-                        
+
+        with patch('ocr.pikepdf', None):
+            with patch('ocr.PyPDF2.PdfReader', return_value=mock_reader):
+                with patch('ocr.PyPDF2.PdfWriter') as mock_writer_class:
+                    mock_writer = Mock()
+                    mock_writer.write = lambda buf: buf.write(b'%PDF-page')
+                    mock_writer_class.return_value = mock_writer
+
+                    # Import and test the function
+                    from ocr import split_pdf_by_pages
+
+                    result = split_pdf_by_pages(temp_pdf_path)
+
+                    # Verify results: pages come back as bytes, no temp files
+                    assert len(result) == 2, f"Expected 2 pages, got {len(result)}"
+                    assert result[0][0] == 1, "First page should be numbered 1"
+                    assert result[1][0] == 2, "Second page should be numbered 2"
+                    assert all(isinstance(page_bytes, bytes) for _, page_bytes in result), \
+                        "Pages should be in-memory bytes"
+
+                    print("✓ PDF splitting test passed")
+
     except Exception as e:
         print(f"✗ PDF splitting test failed: {e}")
     finally:
@@ -61,6 +58,31 @@ def test_pdf_splitting():
         except:
             pass
 
+def test_pdf_split_to_bytes():
+    """Test the in-memory PDF splitter against a real sample document."""
+    print("Testing in-memory PDF splitting...")
+
+    sample_pdf = "sampledata/sample-multi.pdf"
+
+    if not os.path.exists(sample_pdf):
+        print("✗ In-memory PDF splitting test skipped: sample PDF not found")
+        return
+
+    try:
+        from ocr import split_pdf_to_bytes
+
+        pages = split_pdf_to_bytes(sample_pdf)
+
+        assert len(pages) >= 2, f"Expected a multi-page document, got {len(pages)} pages"
+        for i, (page_num, page_bytes) in enumerate(pages, 1):
+            assert page_num == i, f"Pages should be 1-based and ordered, got {page_num}"
+            assert page_bytes.startswith(b"%PDF"), "Each page should be a standalone PDF"
+
+        print("✓ In-memory PDF splitting test passed")
+
+    except Exception as e:
+        print(f"✗ In-memory PDF splitting test failed: {e}")
+
 def test_output_directory_creation():
     """Test output directory creation."""
     print("Testing output directory creation...")
@@ -170,56 +192,73 @@ def test_error_handling():
     except Exception as e:
         print(f"✗ Error handling test failed: {e}")
 
+def test_response_cache():
+    """Test that cached results short-circuit the API call."""
+    print("Testing response cache...")
+
+    try:
+        import ocr
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as temp_pdf:
+                temp_pdf.write(b"%PDF-1.4\n%Cache test content")
+                temp_pdf_path = temp_pdf.name
+
+            try:
+                with patch.dict(os.environ, {'OCR_CACHE_DIR': cache_dir}):
+                    # Seed the cache the same way a successful call would
+                    cached_result = {"products": [{"id": "cached123S"}]}
+                    cache_file = ocr._cache_file_for(ocr._hash_file(temp_pdf_path))
+                    ocr._cache_put(cache_file, cached_result)
+
+                    # The API must not be touched on a cache hit
+                    with patch.object(ocr._session, 'post', side_effect=AssertionError("API called on cache hit")):
+                        result = ocr.process_document(temp_pdf_path)
+
+                    assert result == cached_result, "Cached result should be returned"
+
+                    print("✓ Response cache test passed")
+            finally:
+                try:
+                    os.unlink(temp_pdf_path)
+                except:
+                    pass
+
+    except Exception as e:
+        print(f"✗ Response cache test failed: {e}")
+
 def test_parallel_processing_structure():
     """Test the structure of parallel processing function."""
     print("Testing parallel processing structure...")
     
     try:
         from ocr import process_pdf_by_pages
-        
+
         # Mock the dependencies
-        with patch('ocr.split_pdf_by_pages') as mock_split:
-            with patch('ocr.create_output_directory') as mock_create_dir:
-                with patch('ocr.save_page_result') as mock_save:
-                    with patch('ocr.process_page_parallel') as mock_process:
-                        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with patch('ocr.split_pdf_to_bytes') as mock_split:
+                with patch('ocr.create_output_directory') as mock_create_dir:
+                    with patch('ocr.save_page_result') as mock_save, patch('ocr._count_pages', return_value=2):
+
                         # Mock return values
-                        mock_split.return_value = [(1, '/tmp/page1.pdf'), (2, '/tmp/page2.pdf')]
-                        mock_create_dir.return_value = Path('/tmp/output')
-                        mock_process.return_value = (1, {"products": []})
-                        
-                        # Mock ThreadPoolExecutor and its context manager
-                        mock_executor = Mock()
-                        mock_executor_instance = Mock()
-                        
-                        # Set up the context manager behavior
-                        mock_executor.return_value = mock_executor_instance
-                        mock_executor_instance.__enter__ = Mock(return_value=mock_executor_instance)
-                        mock_executor_instance.__exit__ = Mock(return_value=None)
-                        
-                        # Mock futures
-                        mock_future1 = Mock()
-                        mock_future1.result.return_value = (1, {"products": []})
-                        mock_future2 = Mock()
-                        mock_future2.result.return_value = (2, {"products": []})
-                        
-                        # Set up as_completed to return our futures
-                        mock_executor_instance.submit.return_value = mock_future1
-                        
-                        with patch('ocr.ThreadPoolExecutor', mock_executor):
-                            with patch('ocr.as_completed', return_value=[mock_future1, mock_future2]):
-                                # Test the function
-                                result = process_pdf_by_pages("/tmp/test.pdf", max_workers=2)
-                                
-                                # Verify structure
-                                assert "output_directory" in result
-                                assert "total_pages" in result
-                                assert "successful_pages" in result
-                                assert "failed_pages" in result
-                                assert "results" in result
-                                
-                                print("✓ Parallel processing structure test passed")
-                            
+                        mock_split.return_value = [(1, b'%PDF-page1'), (2, b'%PDF-page2')]
+                        mock_create_dir.return_value = Path(temp_dir)
+                        mock_gather = AsyncMock(return_value={1: {"products": []}, 2: {"products": []}})
+
+                        with patch('ocr._gather_pages', mock_gather):
+                            # Test the function
+                            result = process_pdf_by_pages("/tmp/test.pdf", max_workers=2)
+
+                            # Verify structure
+                            assert "output_directory" in result
+                            assert "total_pages" in result
+                            assert "successful_pages" in result
+                            assert "failed_pages" in result
+                            assert "results" in result
+                            assert result["successful_pages"] == 2
+
+                            print("✓ Parallel processing structure test passed")
+
     except Exception as e:
         print(f"✗ Parallel processing structure test failed: {e}")
 
@@ -229,9 +268,11 @@ def main():
     print("=" * 50)
     
     test_pdf_splitting()
+    test_pdf_split_to_bytes()
     test_output_directory_creation()
     test_page_result_saving()
     test_error_handling()
+    test_response_cache()
     test_parallel_processing_structure()
     
     print("=" * 50)